@@ -0,0 +1,44 @@
+#! /usr/bin/env python3
+import argparse
+import random
+import time
+import generator
+
+DIRECTIONS = [generator.up, generator.down, generator.left, generator.right]
+
+def random_level(rng: random.Random, size: int, enemies: int, blocks: int) -> generator.LevelState:
+    # Entities start on a checkerboard so no two of them are neighbours.
+    # The pass based resolver cannot handle two enemies moving in a chain.
+    state = generator.LevelState(width=size, height=size, exit_pos=(0, -1))
+    cells = [(x, y) for x in range(size) for y in range(size) if (x + y) % 2 == 0]
+    rng.shuffle(cells)
+    state.set_tile(cells.pop(), generator.Tile.PLAYER)
+    for _ in range(enemies):
+        state.set_tile(cells.pop(), generator.Tile.ENEMY)
+    for _ in range(blocks):
+        state.set_tile(cells.pop(), generator.Tile.BLOCK)
+    return state
+
+def time_resolver(levels, resolver) -> float:
+    states = [(generator.LevelState(level), direction) for level in levels for direction in DIRECTIONS]
+    start = time.perf_counter()
+    for state, direction in states:
+        resolver(state, direction)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark movement resolution by enemy count.')
+    parser.add_argument('--size', help='board width and height', default=16, type=int)
+    parser.add_argument('--blocks', help='number of blocks on each board', default=8, type=int)
+    parser.add_argument('--levels', help='number of random boards per enemy count', default=50, type=int)
+    parser.add_argument('--enemies', help='enemy counts to benchmark', default=[0, 1, 2, 5, 10, 20, 40], type=int, nargs='+')
+    parser.add_argument('--seed', help='seed for the random boards', default=0, type=int)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print("enemies  passes (ms)  sweep (ms)  speedup")
+    for enemies in args.enemies:
+        levels = [random_level(rng, args.size, enemies, args.blocks) for _ in range(args.levels)]
+        passes = time_resolver(levels, generator.LevelState.apply_direction_by_passes)
+        sweep = time_resolver(levels, generator.LevelState.apply_direction)
+        print("{:7d}  {:11.1f}  {:10.1f}  {:6.1f}x".format(enemies, passes * 1000, sweep * 1000, passes / sweep))
@@ -2,7 +2,10 @@
 import argparse
 from enum import Enum
 import copy
+import hashlib
+import os
 import random
+import tempfile
 from typing import List, Tuple, Callable, Set
 
 Position = Tuple[int, int]
@@ -54,6 +57,10 @@ class Move(Enum):
             self.CHANGE: "⇄"
             }[self]
 
+TILES_BY_VALUE = list(Tile)
+MOVES_BY_VALUE = {move.value: move for move in Move}
+MOVE_DIRECTIONS = {Move.UP: up, Move.DOWN: down, Move.LEFT: left, Move.RIGHT: right}
+
 class MoveOutcome(Enum):
     UNDETERMINED = 1
     NOTHING = 2
@@ -73,6 +80,24 @@ class ActivePlayer(Enum):
     def change(self):
         return self.WHITE if self == self.BLACK else self.BLACK
 
+class EntityTrack:
+    # Movement of a single entity during one directional move.
+    def __init__(self, pos: Position, tile: Tile, line: int, start: int):
+        self.pos = pos
+        self.tile = tile
+        self.line = line
+        self.start = start
+        self.steps = 0
+        self.final = start
+        self.absorbed = False
+        self.end_pass = None
+        self.outcome = None
+        self.done = 0
+
+    def end(self, end_pass: int, outcome: MoveOutcome):
+        self.end_pass = end_pass
+        self.outcome = outcome
+
 class LevelState:
     field_white = None
     field_black = None
@@ -107,6 +132,32 @@ class LevelState:
         assert(pos[0] != -1 and pos[1] != -1)
         return pos
 
+    def entity_positions(self) -> List[Position]:
+        active_field = self.active_field()
+        entities = []
+        for x in range (self.width):
+            column = active_field[x]
+            for y in range (self.height):
+                if column[y] == Tile.PLAYER or column[y] == Tile.ENEMY:
+                    entities.append((x, y))
+        return entities
+
+    def is_dead_move(self, move: Move, player_pos: Position, entities: List[Position]) -> bool:
+        # True if the move certainly changes nothing, or certainly ends the
+        # level without the player winning. Checked without building the
+        # resulting state.
+        if move == Move.CHANGE:
+            return self.changed_tile(player_pos) in [Tile.BLOCK, Tile.SPIRAL, Tile.ENEMY]
+
+        dir_func = MOVE_DIRECTIONS[move]
+        if self.tile(dir_func(player_pos)) == Tile.SPIRAL:
+            return True
+        for pos in entities:
+            next_pos = dir_func(pos)
+            if next_pos == self.exit_pos or not self.is_stopping(next_pos):
+                return False
+        return True
+
     def tile(self, pos: Position):
         if pos[0] < 0 or pos[0] >= self.width:
             return Tile.OUT_OF_BOUNDS
@@ -165,10 +216,11 @@ class LevelState:
             
         return (MoveOutcome.MOVED, next_pos)
 
-    def apply_direction(self, dir_func = MovementFunction) -> MoveOutcome:
-        # Directions have to be applied to all entities, as long as
-        # stuff keeps happening. First, all entities have to be found. Then,
-        # directions are applied.
+    def apply_direction_by_passes(self, dir_func = MovementFunction) -> MoveOutcome:
+        # Reference resolver. Directions have to be applied to all entities,
+        # as long as stuff keeps happening. First, all entities have to be
+        # found. Then, directions are applied. apply_direction gives the same
+        # results in a single sweep per line.
 
         entities: List[Tuple[MoveOutcome, Position]] = []
         active_field = self.active_field()
@@ -196,6 +248,121 @@ class LevelState:
 
         return MoveOutcome.MOVED if moved_once else MoveOutcome.NOTHING
 
+    def axis_pos(self, line: int, coord: int, horizontal: bool) -> Position:
+        return (coord, line) if horizontal else (line, coord)
+
+    def resolve_line(self, field, line: int, entities: List[Position], horizontal: bool, step: int) -> List[EntityTrack]:
+        # Entities of one row (or column) never interact with other lines, so
+        # every line is resolved on its own. Entities are visited leader
+        # first: a follower either runs into a static tile between itself
+        # and the next entity ahead, or into the cell where the nearest
+        # entity ahead came to rest.
+        length = self.width if horizontal else self.height
+        boundary = length if step == 1 else -1
+        exit_on_line = self.axis_pos(line, boundary, horizontal) == self.exit_pos
+
+        tracks = [EntityTrack(pos, field[pos[0]][pos[1]], line, pos[0] if horizontal else pos[1]) for pos in entities]
+        if step == 1:
+            tracks.reverse()
+
+        front = None
+        prev = None
+        for track in tracks:
+            player = track.tile == Tile.PLAYER
+            start = track.start
+
+            # Moving towards higher coordinates, trailing entities are moved
+            # first. A follower directly behind a moving entity hits it
+            # before it gets out of the way. Two enemies become one.
+            if step == 1 and prev is not None and prev.start == start + step and prev.steps > 0:
+                if not player and prev.tile == Tile.ENEMY:
+                    track.steps = 1
+                    track.absorbed = True
+                else:
+                    track.end(1, MoveOutcome.PLAYER_KILLED)
+                    front = track
+                prev = track
+                continue
+
+            limit = prev.start if prev is not None else boundary
+            coord = start
+            stopped = False
+            while coord + step != limit:
+                tile = field[line][coord + step] if not horizontal else field[coord + step][line]
+                if tile == Tile.BLOCK:
+                    stopped = True
+                    break
+                if tile == Tile.SPIRAL and player:
+                    track.end(track.steps + 1, MoveOutcome.PLAYER_KILLED)
+                    stopped = True
+                    break
+                coord += step
+                track.steps += 1
+
+            if not stopped:
+                if front is None:
+                    if exit_on_line:
+                        track.end(track.steps + 1, MoveOutcome.PLAYER_WON if player else MoveOutcome.ENEMY_WON)
+                else:
+                    track.steps += (front.final - coord) * step - 1
+                    if not player and front.tile == Tile.ENEMY:
+                        track.steps += 1
+                    else:
+                        track.end(track.steps + 1, MoveOutcome.PLAYER_KILLED)
+
+            track.final = start + step * track.steps
+            front = track
+            prev = track
+
+        return tracks
+
+    def apply_direction(self, dir_func = MovementFunction) -> MoveOutcome:
+        # All entities move one tile per pass until none can move anymore.
+        # Instead of simulating the passes, every line is swept once and the
+        # pass in which an entity stops, wins or dies is computed directly.
+        # The first ending in pass and scan order decides the outcome.
+        delta = dir_func((0, 0))
+        horizontal = delta[1] == 0
+        step = delta[0] if horizontal else delta[1]
+        field = self.active_field()
+
+        lines = {}
+        for x in range (self.width):
+            column = field[x]
+            for y in range (self.height):
+                if column[y] == Tile.PLAYER or column[y] == Tile.ENEMY:
+                    lines.setdefault(y if horizontal else x, []).append((x, y))
+
+        tracks: List[EntityTrack] = []
+        for line, entities in lines.items():
+            tracks.extend(self.resolve_line(field, line, entities, horizontal, step))
+
+        ending = None
+        for track in tracks:
+            if track.outcome is not None:
+                key = (track.end_pass, track.pos)
+                if ending is None or key < ending[0]:
+                    ending = (key, track.outcome)
+
+        # Place entities where they are at the end of the move, or at the
+        # moment the ending happened. Enemies erase spirals they pass over.
+        for track in tracks:
+            if ending is None:
+                track.done = track.steps
+            else:
+                end_pass, end_pos = ending[0]
+                track.done = min(track.steps, end_pass if track.pos < end_pos else end_pass - 1)
+            for i in range(track.done):
+                self.set_tile(self.axis_pos(track.line, track.start + step * i, horizontal), Tile.BLANK)
+        for track in tracks:
+            if track.absorbed and track.done > 0:
+                continue
+            self.set_tile(self.axis_pos(track.line, track.start + step * track.done, horizontal), track.tile)
+
+        if ending is not None:
+            return ending[1]
+        return MoveOutcome.MOVED if any(track.steps > 0 for track in tracks) else MoveOutcome.NOTHING
+
     def apply_UP(self) -> MoveOutcome:
         return self.apply_direction(up)
     def apply_DOWN(self) -> MoveOutcome:
@@ -287,8 +454,27 @@ class LevelState:
         s += str(self.exit_pos[0]) + "," + str(self.exit_pos[1])
         return s
 
+    def to_bytes(self) -> bytes:
+        # One byte for the active player, then one byte per tile of both
+        # fields. Size and exit are constant during a search and not stored.
+        data = bytearray([self.active_player.value])
+        for field in (self.field_white, self.field_black):
+            for column in field:
+                data.extend(tile.value for tile in column)
+        return bytes(data)
+
+    def from_bytes(data: bytes, width: int, height: int, exit_pos: Position):
+        state = LevelState(width=width, height=height, exit_pos=exit_pos)
+        state.active_player = ActivePlayer(data[0])
+        offset = 1
+        for field in (state.field_white, state.field_black):
+            for x in range(width):
+                field[x] = [TILES_BY_VALUE[v] for v in data[offset:offset + height]]
+                offset += height
+        return state
+
 class BotPlayerSearcher:
-    def __init__(self, state: LevelState, start_pos: Position, max_depth: int):
+    def __init__(self, state: LevelState, start_pos: Position, max_depth: int, history: dict = None):
         assert(start_pos[0] >= 0 and start_pos[0] < state.width)
         assert(start_pos[1] >= 0 and start_pos[1] < state.height)
         assert(state is not None)
@@ -298,6 +484,20 @@ class BotPlayerSearcher:
         self.path = []
         self.max_depth = max_depth
 
+        # History heuristic: (player position, move) -> number of times the
+        # search reached the depth limit alive through that move. Shared
+        # between iterations, paths that survived the last iteration are
+        # the ones a solution one move longer extends.
+        self.history = history if history is not None else {}
+        self.horizon_hits = 0
+
+    def ordered_moves(self, state: LevelState):
+        entities = state.entity_positions()
+        player_pos = next(pos for pos in entities if state.tile(pos) == Tile.PLAYER)
+        moves = [move for move in Move if not state.is_dead_move(move, player_pos, entities)]
+        moves.sort(key=lambda move: -self.history.get((player_pos, move), 0))
+        return player_pos, moves
+
     def do_search(self):
         assert(self.state is not None)
         return self.search(self.state, 0)
@@ -312,15 +512,26 @@ class BotPlayerSearcher:
         if state.outcome.is_ending():
             return None
 
-        for move in Move:
+        # Successors below the depth limit are never looked at.
+        if depth == self.max_depth:
+            self.horizon_hits += 1
+            return None
+
+        player_pos, moves = self.ordered_moves(state)
+        for move in moves:
             next_state = LevelState(state, move)
             assert(next_state is not None)
             self.path.append(move)
+            horizon_hits = self.horizon_hits
             next_step = self.search(next_state, len(self.path))
             if next_step is not None:
                 return next_step
             self.path.pop()
 
+            if self.horizon_hits > horizon_hits:
+                key = (player_pos, move)
+                self.history[key] = self.history.get(key, 0) + self.horizon_hits - horizon_hits
+
         return None
     
 class BotPlayer:
@@ -339,13 +550,119 @@ class BotPlayer:
         self.desired_depth = desired_depth
 
     def search_path_ids(self):
+        history = {}
         for max_depth in range(1, 100):
-            searcher = BotPlayerSearcher(self.state, self.start_pos, max_depth)
+            searcher = BotPlayerSearcher(self.state, self.start_pos, max_depth, history)
             if searcher.do_search() is not None:
                 return searcher.path
 
         return False
 
+class BoundedStateSet:
+    # Visited set holding at most max_states entries. States are grouped by
+    # BFS layer and the oldest layers are forgotten first once the budget is
+    # reached. Forgetting only lets duplicates through, it never hides a
+    # state that has not been seen yet.
+    def __init__(self, max_states: int):
+        assert(max_states > 0)
+        self.max_states = max_states
+        self.layers: List[Set[bytes]] = []
+        self.size = 0
+
+    def start_layer(self):
+        self.layers.append(set())
+
+    def add(self, key: bytes) -> bool:
+        for layer in self.layers:
+            if key in layer:
+                return False
+
+        while self.size >= self.max_states:
+            if len(self.layers) > 1:
+                self.size -= len(self.layers.pop(0))
+            else:
+                self.size = 0
+                self.layers[0].clear()
+
+        self.layers[-1].add(key)
+        self.size += 1
+        return True
+
+class DiskBotPlayer:
+    # Breadth-first solver for large boards. Only the visited set lives in
+    # memory and is bounded by max_states, frontier layers are spilled to
+    # fixed size records in temporary files. A record is the encoded state
+    # followed by one byte per move of the path leading to it.
+    def __init__(self, state: LevelState, start_pos: Position = None, max_states: int = 1000000, max_depth: int = 99, spill_dir: str = None):
+        if start_pos is None:
+            start_pos = state.player_pos()
+
+        assert(start_pos[0] >= 0 and start_pos[0] < state.width)
+        assert(start_pos[1] >= 0 and start_pos[1] < state.height)
+
+        self.state = LevelState(state)
+        self.state.set_tile(start_pos, Tile.PLAYER)
+        self.max_states = max_states
+        self.max_depth = max_depth
+        self.spill_dir = spill_dir
+
+    def decode(self, data: bytes) -> LevelState:
+        return LevelState.from_bytes(data, self.state.width, self.state.height, self.state.exit_pos)
+
+    def read_layer(self, path: str, record_size: int):
+        with open(path, 'rb') as f:
+            while True:
+                record = f.read(record_size)
+                if len(record) < record_size:
+                    return
+                yield record
+
+    def search_path_bfs(self):
+        start = self.state.to_bytes()
+        state_size = len(start)
+        visited = BoundedStateSet(self.max_states)
+        visited.start_layer()
+        visited.add(start)
+
+        with tempfile.TemporaryDirectory(dir=self.spill_dir) as tmp_dir:
+            layer_path = os.path.join(tmp_dir, "layer-0")
+            with open(layer_path, 'wb') as f:
+                f.write(start)
+
+            for depth in range(self.max_depth):
+                visited.start_layer()
+                next_layer_path = os.path.join(tmp_dir, "layer-" + str(depth + 1))
+                next_layer_size = 0
+
+                with open(next_layer_path, 'wb') as f:
+                    for record in self.read_layer(layer_path, state_size + depth):
+                        state = self.decode(record[:state_size])
+                        entities = state.entity_positions()
+                        player_pos = next(pos for pos in entities if state.tile(pos) == Tile.PLAYER)
+                        for move in Move:
+                            if state.is_dead_move(move, player_pos, entities):
+                                continue
+                            next_state = LevelState(state, move)
+                            if next_state.outcome == MoveOutcome.PLAYER_WON:
+                                return [MOVES_BY_VALUE[v] for v in record[state_size:]] + [move]
+                            if next_state.outcome.is_ending():
+                                continue
+                            key = next_state.to_bytes()
+                            if not visited.add(key):
+                                continue
+                            f.write(key)
+                            f.write(record[state_size:])
+                            f.write(bytes([move.value]))
+                            next_layer_size += 1
+
+                os.remove(layer_path)
+                layer_path = next_layer_path
+
+                if next_layer_size == 0:
+                    break
+
+        return False
+
 class LevelSearcherConfig:
     width: int = 4 # Constant
     height: int = 4 # Constant
@@ -355,9 +672,14 @@ class LevelSearcherConfig:
     moves: int = 0 # Growing
     changes: int = 1 # Shrinking
     blocks: int = 1 # Shrinking
+    solver_memory: int = 0 # Constant, visited states kept by the disk solver, 0 disables it
+    solver_spill_dir: str = None # Constant
 
 class GeneratorAction:
-    move: Move = None
+    __slots__ = ('move',)
+
+    def __init__(self):
+        self.move = None
 
     def do(self, state: LevelState, config: LevelSearcherConfig):
         pass
@@ -366,8 +688,10 @@ class GeneratorAction:
         pass
 
     def get_moves(actions):
+        # The action stack grows at the end, the latest action is the
+        # first move of the level.
         moves = []
-        for action in actions:
+        for action in reversed(actions):
             if action.move is not None:
                 moves.append(action.move)
         return moves
@@ -376,6 +700,8 @@ class GeneratorAction:
         return "GeneratorAction"
 
 class GeneratorMovementAction(GeneratorAction):
+    __slots__ = ('source', 'stopper', 'orig_stopper_tile', 'player_pos')
+
     def __init__(self, player_pos: Position, source: Position, stopper: Position, move: Move):
         self.source = source
         self.stopper = stopper
@@ -412,7 +738,9 @@ class GeneratorMovementAction(GeneratorAction):
     def __str__(self):
         return "(" + str(self.move) + ", source=" + str(self.source) + ", stopper=" + str(self.stopper) + ")"
 
-class GeneratorChangeAction:
+class GeneratorChangeAction(GeneratorAction):
+    __slots__ = ()
+
     def __init__(self):
         self.move = Move.CHANGE
 
@@ -430,7 +758,9 @@ class GeneratorChangeAction:
         state.set_tile(player_pos, Tile.PLAYER)
         config.changes += 1
 
-class GeneratorBlockAction:
+class GeneratorBlockAction(GeneratorAction):
+    __slots__ = ('pos',)
+
     def __init__(self, pos: Position):
         self.pos = pos
         self.move = None
@@ -443,7 +773,9 @@ class GeneratorBlockAction:
         state.set_tile(self.pos, Tile.BLANK)
         config.blocks += 1
 
-class GeneratorEnemyAction:
+class GeneratorEnemyAction(GeneratorAction):
+    __slots__ = ('pos',)
+
     def __init__(self, pos: Position):
         self.pos = pos
         self.move = None
@@ -457,7 +789,9 @@ class GeneratorEnemyAction:
         state.set_tile(self.pos, Tile.BLANK)
         config.enemies += 1
 
-class GeneratorSpiralAction:
+class GeneratorSpiralAction(GeneratorAction):
+    __slots__ = ('pos',)
+
     def __init__(self, pos: Position):
         self.pos = pos
         self.move = None
@@ -471,24 +805,46 @@ class GeneratorSpiralAction:
         state.set_tile(self.pos, Tile.BLANK)
         config.spirals += 1
 
+def shuffled(items: list, rng: random.Random):
+    # Lazy Fisher-Yates shuffle, every item costs O(1) and items that are
+    # never reached are never touched. Reorders items in place.
+    for i in range(len(items) - 1, -1, -1):
+        j = rng.randrange(i + 1)
+        items[i], items[j] = items[j], items[i]
+        yield items[i]
+
+def level_seed(root_seed: int, index: int) -> int:
+    # Seed of level index in a batch. Only depends on the root seed and the
+    # index, so any level can be generated alone, by any worker.
+    digest = hashlib.sha256((str(root_seed) + ":" + str(index)).encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
 class LevelSearcher:
-    def get_random_exit_pos(width: int, height: int) -> Position:
-        end_pos_x = random.randrange(-1, width + 1)
+    def get_random_exit_pos(width: int, height: int, rng: random.Random = random) -> Position:
+        end_pos_x = rng.randrange(-1, width + 1)
         end_pos_y = 0
         if end_pos_x == -1 or end_pos_x == width:
-            end_pos_y = random.randrange(height)
+            end_pos_y = rng.randrange(height)
         else:
-            end_pos_y = random.choice([-1, height])
+            end_pos_y = rng.choice([-1, height])
         return (end_pos_x, end_pos_y)
     
-    def __init__(self, config: LevelSearcherConfig):
+    def __init__(self, config: LevelSearcherConfig, seed: int = None):
         self.width = config.width
         self.height = config.height
         self.config = config
         self.max_depth = 1
         self.player_pos = [0, 0]
+        self.random = random.Random(seed)
+
+        # Placing and change actions carry no state of their own, so one
+        # instance per position is shared by all expansions.
+        self.change_action = GeneratorChangeAction()
+        self.block_actions = [[GeneratorBlockAction((x, y)) for y in range(self.height)] for x in range(self.width)]
+        self.enemy_actions = [[GeneratorEnemyAction((x, y)) for y in range(self.height)] for x in range(self.width)]
+        self.spiral_actions = [[GeneratorSpiralAction((x, y)) for y in range(self.height)] for x in range(self.width)]
 
-        exit_pos = LevelSearcher.get_random_exit_pos(self.width, self.height)
+        exit_pos = LevelSearcher.get_random_exit_pos(self.width, self.height, self.random)
         self.level = LevelState(width=self.width, height=self.height, exit_pos=exit_pos)
 
     def expand_moves(self, state: LevelState, player_pos: Position):
@@ -532,11 +888,11 @@ class LevelSearcher:
                     pos = (x, y)
                     if not state.is_killing(pos) and not state.is_stopping(pos) and state.tile(pos) != Tile.PLAYER:
                         if running_config.spirals > 0:
-                            actions.append(GeneratorSpiralAction(pos))
+                            actions.append(self.spiral_actions[x][y])
                         if running_config.enemies > 0:
-                            actions.append(GeneratorEnemyAction(pos))
+                            actions.append(self.enemy_actions[x][y])
                         if running_config.blocks:
-                            actions.append(GeneratorBlockAction(pos))
+                            actions.append(self.block_actions[x][y])
 
         # Movement
         if running_config.moves == 0:
@@ -548,7 +904,7 @@ class LevelSearcher:
             if running_config.changes > 0:
                 changed_tile = state.changed_tile(player_pos)
                 if changed_tile not in [Tile.BLOCK, Tile.ENEMY, Tile.SPIRAL]:
-                    actions.append(GeneratorChangeAction())
+                    actions.append(self.change_action)
 
         actions.extend(self.expand_moves(state, player_pos))
 
@@ -578,8 +934,12 @@ class LevelSearcher:
                 return False
 
         # Check if there is any shorter way
-        bot = BotPlayer(copy.deepcopy(state), state.player_pos(), len(moves))
-        shortest_path = bot.search_path_ids()
+        if config.solver_memory > 0:
+            bot = DiskBotPlayer(state, state.player_pos(), config.solver_memory, len(moves), config.solver_spill_dir)
+            shortest_path = bot.search_path_bfs()
+        else:
+            bot = BotPlayer(copy.deepcopy(state), state.player_pos(), len(moves))
+            shortest_path = bot.search_path_ids()
 
         # No solution found!
         if not shortest_path:
@@ -595,7 +955,7 @@ class LevelSearcher:
 
         while result is None:
             self.max_depth += 1
-            result = self.inner_search(self.config)
+            result = self.inner_search(self.config, 0, [])
 
         return (self.level, GeneratorAction.get_moves(result))
         
@@ -612,10 +972,8 @@ class LevelSearcher:
         available_actions = self.expand(self.level, running_config)
 
         # Select random action, apply it and do recursion.
-        while len(available_actions) > 0:
-            selected_action = random.choice(available_actions)
-            available_actions.remove(selected_action)
-            actions.insert(0, selected_action)
+        for selected_action in shuffled(available_actions, self.random):
+            actions.append(selected_action)
 
             selected_action.do(self.level, running_config)
 
@@ -624,7 +982,7 @@ class LevelSearcher:
                 return search_result
             else:
                 selected_action.undo(self.level, running_config)
-                actions.pop(0)
+                actions.pop()
 
         return None
     
@@ -636,13 +994,16 @@ class LevelDescription:
 
     start_state: LevelState
 
-    def __init__(self, width : int = 4, height : int = 4, enable_spiral : bool = False, enable_enemy : bool = False, changes: int = 1, blocks: int = 1):
+    def __init__(self, width : int = 4, height : int = 4, enable_spiral : bool = False, enable_enemy : bool = False, changes: int = 1, blocks: int = 1, solver_memory: int = 0, solver_spill_dir: str = None, seed: int = None):
         self.width = width
         self.height = height
         self.enable_spiral = enable_spiral
         self.enable_enemy = enable_enemy
         self.changes = changes
         self.blocks = blocks
+        self.solver_memory = solver_memory
+        self.solver_spill_dir = solver_spill_dir
+        self.seed = seed if seed is not None else random.randrange(2**64)
 
     def generate_with_player_from_exit_pos(self, steps: int):
         config = LevelSearcherConfig()
@@ -653,13 +1014,15 @@ class LevelDescription:
         config.move_count = steps
         config.changes = self.changes
         config.blocks = self.blocks
+        config.solver_memory = self.solver_memory
+        config.solver_spill_dir = self.solver_spill_dir
 
-        searcher = LevelSearcher(config)
+        searcher = LevelSearcher(config, self.seed)
         self.state, self.moves = searcher.search()
         self.player_pos = self.state.player_pos()
 
     def __str__(self):
-        return str(self.state) + "\n Moves: " + ", ".join(map(str, self.moves)) + "\n Start: " + str(self.player_pos)
+        return str(self.state) + "\n Moves: " + ", ".join(map(str, self.moves)) + "\n Start: " + str(self.player_pos) + "\n Seed: " + str(self.seed)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Generate levels for ShadeChange.')
@@ -670,16 +1033,30 @@ if __name__ == "__main__":
     parser.add_argument('--blocks', help='number of randomly set blocks a level may include', default=1, type=int)
     parser.add_argument('--enable-spiral', help='enable the spiral tile type', default=False, action="store_true")
     parser.add_argument('--enable-enemy', help='enable the enemy entity', default=False, action="store_true")
+    parser.add_argument('--solver-memory', help='verify levels with the disk backed solver, keeping at most this many visited states in memory', default=0, type=int)
+    parser.add_argument('--solver-spill-dir', help='directory for the frontier files of the disk backed solver', default=None)
+    parser.add_argument('--seed', help='root seed of the batch, random if not given', default=None, type=int)
+    parser.add_argument('--count', help='number of levels to generate', default=1, type=int)
+    parser.add_argument('--first-level', help='index of the first level to generate, to re-create a single level of a batch', default=0, type=int)
+    parser.add_argument('--shard-index', help='only generate levels whose index modulo --shard-count equals this', default=0, type=int)
+    parser.add_argument('--shard-count', help='number of workers the batch is split over', default=1, type=int)
     parser.add_argument('--print-list', help='print output to list. First section is white board, second is black.', default=False, action="store_true")
     parser.add_argument('--print-human-readable', help='print human readable output', default=True, action="store_true")
     args = parser.parse_args()
 
-    level = LevelDescription(width=args.width, height=args.height, enable_enemy=args.enable_enemy, enable_spiral=args.enable_spiral, changes=args.changes, blocks=args.blocks)
-    level.generate_with_player_from_exit_pos(args.steps)
+    root_seed = args.seed if args.seed is not None else random.randrange(2**64)
+
+    for index in range(args.first_level, args.first_level + args.count):
+        if index % args.shard_count != args.shard_index:
+            continue
+
+        level = LevelDescription(width=args.width, height=args.height, enable_enemy=args.enable_enemy, enable_spiral=args.enable_spiral, changes=args.changes, blocks=args.blocks, solver_memory=args.solver_memory, solver_spill_dir=args.solver_spill_dir, seed=level_seed(root_seed, index))
+        level.generate_with_player_from_exit_pos(args.steps)
 
-    if args.print_human_readable:
-        print(level)
-        print("\n")
-    if args.print_list:
-        print(level.state.to_list())
+        if args.print_human_readable:
+            print(" Level: {} (root seed {})".format(index, root_seed))
+            print(level)
+            print("\n")
+        if args.print_list:
+            print(level.state.to_list())
 